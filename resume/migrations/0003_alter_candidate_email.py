@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-08-26 13:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume', '0002_resumeparse'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='candidate',
+            name='email',
+            field=models.EmailField(db_index=True, max_length=254),
+        ),
+    ]
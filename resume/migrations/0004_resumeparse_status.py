@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-08-26 13:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume', '0003_alter_candidate_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumeparse',
+            name='status',
+            field=models.CharField(default='done', max_length=10),
+        ),
+    ]
@@ -2,5 +2,17 @@ from django.db import models
 
 # Create your models here.
 class Candidate(models.Model):
-    email = models.EmailField()
-    password = models.TextField()
\ No newline at end of file
+    email = models.EmailField(db_index=True)
+    password = models.TextField()
+
+
+class ResumeParse(models.Model):
+    STATUS_PENDING = "pending"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+
+    # Parsed resume payload lives here instead of the session, so each
+    # request only carries the row id through the session store.
+    data = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, default=STATUS_DONE)
+    created_at = models.DateTimeField(auto_now_add=True)
\ No newline at end of file
@@ -5,6 +5,7 @@ urlpatterns = [
     path('', views.login_candidate, name='login_candidate'),
     path('signup/', views.signup_candidate, name='signup_candidate'),
     path('upload/', views.upload_resume, name='upload_resume'),
+    path('upload/result/', views.resume_result, name='resume_result'),
     path('interview/start/', views.start_interview, name='start_interview'),
     path('interview/submit/', views.submit_answer, name='submit_answer'),
     path('interview/feedback/', views.interview_feedback, name='interview_feedback'),
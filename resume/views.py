@@ -1,36 +1,147 @@
 import os
 import re
-import random
-import spacy
-import pdfplumber
+import secrets
+import shutil
+import string
+import threading
+from datetime import timedelta
+from functools import lru_cache, reduce
+from operator import or_
+
 import docx
 import fitz  # PyMuPDF
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 from django.conf import settings
+from django.core.files.move import file_move_safe
+from django.db import connection
+from django.utils import timezone
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.contrib.auth.hashers import check_password, make_password
 
 from .forms import ResumeUploadForm
-from .models import Candidate
-
-nlp = spacy.load("en_core_web_sm")
+from .models import Candidate, ResumeParse
+
+# Compiled once at import; extract_resume_data runs per upload and should
+# not re-parse pattern strings on every call.
+_EMAIL_RE = re.compile(r"[\w\.-]+@[\w\.-]+")
+# Non-capturing groups with explicit digit bounds: worst-case matching
+# time stays linear in the input, even on adversarial digit runs.
+_PHONE_RE = re.compile(r"(?:\+?\d{1,3}[-.\s]?)?(?:\(?\d{3,5}\)?[-.\s]?){1,2}\d{3,5}")
+
+_SKILL_KEYWORDS = ("python", "java", "sql", "html", "css", "react", "django", "aws", "linux")
+_SKILL_RE = re.compile(r"\b(" + "|".join(map(re.escape, _SKILL_KEYWORDS)) + r")\b", re.I)
+
+# Regex alternation degrades as the skill vocabulary grows; when
+# pyahocorasick is installed, scan with a DFA that stays O(text) no
+# matter how many keywords are registered.
+if ahocorasick is not None:
+    _SKILL_AUTOMATON = ahocorasick.Automaton()
+    for _skill in _SKILL_KEYWORDS:
+        _SKILL_AUTOMATON.add_word(_skill, _skill)
+    _SKILL_AUTOMATON.make_automaton()
+else:
+    _SKILL_AUTOMATON = None
+
+
+def _find_skills(low):
+    if _SKILL_AUTOMATON is None:
+        return sorted(set(_SKILL_RE.findall(low)))
+
+    found = set()
+    for end, skill in _SKILL_AUTOMATON.iter(low):
+        # Match \b semantics in the regex fallback: underscores count as
+        # word characters too.
+        start = end - len(skill) + 1
+        if start and (low[start - 1].isalnum() or low[start - 1] == "_"):
+            continue
+        if end + 1 < len(low) and (low[end + 1].isalnum() or low[end + 1] == "_"):
+            continue
+        found.add(skill)
+    return sorted(found)
+
+
+_FLAGS_RE = re.compile(r"experience|internship|worked|project")
+
+# Deletion table for cleaning the name line: everything except letters
+# and whitespace goes; str.translate runs in C with no regex machinery.
+# str.translate deletes code points mapped to None, and __missing__
+# extends that default to all of Unicode (bullets, smart quotes, dashes)
+# instead of just the first 256 code points a literal dict could list.
+# Unicode whitespace survives, like the old regex's \s class - PDF
+# extractors emit NBSP between name parts, and deleting it would fuse
+# adjacent words.
+class _DeleteUnmapped(dict):
+    def __missing__(self, key):
+        return key if chr(key).isspace() else None
+
+
+_NAME_KEEP = set(string.ascii_letters + " \t")
+_NAME_TABLE = _DeleteUnmapped({ord(c): c for c in _NAME_KEEP})
+
+_DEGREE_RANKS = {"b.tech": 3, "m.tech": 4, "phd": 5}
+_DEGREE_RE = re.compile(r"\b(" + "|".join(map(re.escape, _DEGREE_RANKS)) + r")\b", re.I)
+
+# How long resume_result waits on a pending parse before declaring the
+# background thread dead.
+_PARSE_TIMEOUT = timedelta(minutes=2)
+
+_JOB_SKILL_MAP = {
+    "full stack developer": ("python", "django", "html", "css", "javascript", "react", "node"),
+    "software engineer": ("java", "python", "c++", "algorithms", "dsa"),
+    "data scientist": ("python", "machine learning", "pandas", "numpy", "sql", "deep learning"),
+    "cloud engineer": ("aws", "azure", "gcp", "linux", "terraform"),
+    "data analyst": ("sql", "excel", "power bi", "python", "tableau"),
+}
+
+
+@lru_cache(maxsize=1)
+def _nlp():
+    # Nothing on the hot path uses spaCy anymore; any future NER work
+    # must go through this accessor so the model loads lazily, once per
+    # worker, and without the pipeline components we don't need.
+    #
+    # When processing many resumes at once (e.g. a backfill), do NOT call
+    # _nlp()(text) per document - use _nlp().pipe(texts, batch_size=64,
+    # n_process=os.cpu_count() // 2) to amortize model invocation and
+    # spread the work across cores.
+    import spacy
+    return spacy.load(
+        "en_core_web_sm",
+        disable=["ner", "parser", "tagger", "lemmatizer", "attribute_ruler"],
+    )
 
 
 # ============================================
 #  TEXT EXTRACTION
 # ============================================
-def extract_text_from_pdf(pdf_path):
-    text = ""
+def _parse_pdf(pdf_path):
+    # One fitz.open per upload: text and the profile image come out of the
+    # same pass instead of parsing the document twice.
+    parts = []
+    image_url = None
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
+        doc = fitz.open(pdf_path)
+        for index, page in enumerate(doc):
+            # sort=True keeps reading order on multi-column layouts; the
+            # raw extraction order demotes the name/role header lines on
+            # several sample resumes.
+            page_text = page.get_text("text", sort=True)
+            if page_text:
+                parts.append(page_text)
+            # The profile photo sits on the first page in practice; a
+            # scanned multi-page PDF can hold hundreds of images, so
+            # don't go hunting through the rest of the document.
+            if index == 0:
+                image_url = _save_page_image(doc, page)
     except Exception as e:
         print("PDF error:", e)
-    return text
+    return "\n".join(parts), image_url
 
 
 def extract_text_from_docx(docx_path):
@@ -45,22 +156,23 @@ def extract_text_from_docx(docx_path):
 # ============================================
 #  IMAGE EXTRACTION
 # ============================================
-def extract_image_from_pdf(path):
+def _save_page_image(doc, page):
     try:
-        doc = fitz.open(path)
-        for page in doc:
-            for img in page.get_images():
-                xref = img[0]
-                base = doc.extract_image(xref)
-                ext = base["ext"]
-                data = base["image"]
-                filename = f"profile_{random.randint(1111,9999)}.{ext}"
-                save_path = os.path.join(settings.MEDIA_ROOT, filename)
-
-                with open(save_path, "wb") as f:
-                    f.write(data)
-
-                return settings.MEDIA_URL + filename
+        images = page.get_images()
+        if not images:
+            return None
+
+        xref = images[0][0]
+        base = doc.extract_image(xref)
+        ext = base["ext"]
+        data = base["image"]
+        filename = f"profile_{secrets.token_hex(8)}.{ext}"
+        save_path = os.path.join(settings.MEDIA_ROOT, filename)
+
+        with open(save_path, "wb") as f:
+            f.write(data)
+
+        return settings.MEDIA_URL + filename
     except Exception as e:
         print("Image error:", e)
     return None
@@ -69,26 +181,39 @@ def extract_image_from_pdf(path):
 # ============================================
 #  COMPANY MATCHING (AI Recommendation)
 # ============================================
+_COMPANY_SKILLS = {
+    "Google": frozenset(["python", "tensorflow", "machine learning"]),
+    "Microsoft": frozenset(["azure", "python", "c#"]),
+    "Amazon": frozenset(["aws", "python", "java"]),
+    "Infosys": frozenset(["python", "django", "sql"]),
+    "Wipro": frozenset(["html", "css", "javascript"]),
+    "Accenture": frozenset(["cloud", "react", "sql"]),
+    "IBM": frozenset(["cloud", "java", "data analysis"]),
+    "TCS": frozenset(["java", "spring", "sql"]),
+}
+
+# Every extraction keyword gets a bit; a company's requirements collapse
+# to one int, so matching a candidate is a single AND per company. Skills
+# outside the extraction vocabulary can never be detected, so they carry
+# no bit.
+_SKILL_BIT = {skill: i for i, skill in enumerate(_SKILL_KEYWORDS)}
+_COMPANY_MASK = {
+    company: reduce(or_, (1 << _SKILL_BIT[s] for s in req if s in _SKILL_BIT), 0)
+    for company, req in _COMPANY_SKILLS.items()
+}
+
+
 def ai_chatbot_response(skills):
-    company_db = {
-        "Google": ["python", "tensorflow", "machine learning"],
-        "Microsoft": ["azure", "python", "c#"],
-        "Amazon": ["aws", "python", "java"],
-        "Infosys": ["python", "django", "sql"],
-        "Wipro": ["html", "css", "javascript"],
-        "Accenture": ["cloud", "react", "sql"],
-        "IBM": ["cloud", "java", "data analysis"],
-        "TCS": ["java", "spring", "sql"],
-    }
+    cand = reduce(or_, (1 << _SKILL_BIT[s] for s in skills if s in _SKILL_BIT), 0)
 
     suggestions = []
-    for company, req in company_db.items():
-        match = set(skills) & set(req)
+    for company, mask in _COMPANY_MASK.items():
+        match = cand & mask
         if match:
             suggestions.append({
                 "company": company,
-                "matched_skills": list(match),
-                "match_score": len(match)
+                "matched_skills": [s for s in _SKILL_KEYWORDS if match >> _SKILL_BIT[s] & 1],
+                "match_score": match.bit_count(),
             })
 
     return sorted(suggestions, key=lambda x: x["match_score"], reverse=True)
@@ -98,33 +223,55 @@ def ai_chatbot_response(skills):
 #  RESUME DATA EXTRACTION
 # ============================================
 def extract_resume_data(file_path):
-    text = extract_text_from_pdf(file_path) if file_path.endswith(".pdf") else extract_text_from_docx(file_path)
+    if file_path.endswith(".pdf"):
+        text, profile_img = _parse_pdf(file_path)
+    else:
+        text, profile_img = extract_text_from_docx(file_path), None
+
+    # Name, role, email and phone all sit on the first page in practice,
+    # so do the header work on the first 4KB instead of splitting and
+    # scanning the whole document; fall back to a full scan only when a
+    # contact field is genuinely missing from the header.
+    head = text[:4096]
+    if len(text) > 4096:
+        # Trim the slice to its last complete line so an email or phone
+        # straddling the cut can't match as a truncated prefix; the
+        # full-text fallback finds the real value instead.
+        head = head[:head.rfind("\n") + 1] or head
 
-    lines = [l.strip() for l in text.split("\n") if l.strip()]
+    lines = [l.strip() for l in head.split("\n") if l.strip()]
 
     raw_name = lines[0] if lines else "Unknown"
-    name = re.sub(r"[^A-Za-z\s]", "", raw_name).strip()
+    name = raw_name.translate(_NAME_TABLE).strip()
 
     job_role = lines[1] if len(lines) > 1 else "Not found"
 
-    email = re.search(r"[\w\.-]+@[\w\.-]+", text)
-    phone = re.search(r"\+?\d[\d\-\s]{7,20}", text)
+    email = _EMAIL_RE.search(head) or _EMAIL_RE.search(text)
+    phone = _PHONE_RE.search(head) or _PHONE_RE.search(text)
+
+    low = text.lower()
 
-    skill_keywords = ["python", "java", "sql", "html", "css", "react", "django", "aws", "linux"]
-    skills = [s for s in skill_keywords if re.search(rf"\b{s}\b", text, re.I)]
+    skills = _find_skills(low)
 
-    has_experience = any(x in text.lower() for x in ["experience", "internship", "worked"])
-    has_project = "project" in text.lower()
+    has_experience = False
+    has_project = False
+    for m in _FLAGS_RE.finditer(low):
+        if m.group() == "project":
+            has_project = True
+        else:
+            has_experience = True
+        if has_experience and has_project:
+            break
 
-    degree_map = {"b.tech": 3, "m.tech": 4, "phd": 5}
-    degree = next((d.upper() for d in degree_map if d in text.lower()), "Unknown")
-    degree_score = degree_map.get(degree.lower(), 0)
+    degree_match = _DEGREE_RE.search(text)
+    degree_key = degree_match.group(1).lower() if degree_match else None
+    degree = degree_key.upper() if degree_key else "Unknown"
+    degree_score = _DEGREE_RANKS.get(degree_key, 0)
 
     total_score = degree_score + len(skills) + (2 if has_project else 0) + (1 if has_experience else 0)
     rank_score = round((total_score / 20) * 10, 2)
 
     companies = ai_chatbot_response(skills)
-    profile_img = extract_image_from_pdf(file_path) if file_path.endswith(".pdf") else None
 
     return {
         "name": name,
@@ -208,20 +355,82 @@ def upload_resume(request):
         if form.is_valid():
             f = request.FILES["resume"]
             path = os.path.join(settings.MEDIA_ROOT, f.name)
-            with open(path, "wb+") as dest:
-                for chunk in f.chunks():
-                    dest.write(chunk)
+            if hasattr(f, "temporary_file_path"):
+                # Large uploads are already on disk; move the file. The
+                # helper renames when it can and streams when the temp
+                # dir and MEDIA_ROOT sit on different filesystems.
+                file_move_safe(f.temporary_file_path(), path, allow_overwrite=True)
+            else:
+                with open(path, "wb") as dest:
+                    shutil.copyfileobj(f.file, dest, length=1024 * 1024)
+
+            # Parsing can take seconds on big PDFs; hand it to a worker
+            # thread so the HTTP worker is free as soon as the file lands.
+            parse = ResumeParse.objects.create(status=ResumeParse.STATUS_PENDING)
+            request.session["resume_id"] = parse.pk
+            threading.Thread(
+                target=_parse_resume_job, args=(parse.pk, path), daemon=True
+            ).start()
+
+            return redirect("resume_result")
 
-            data = extract_resume_data(path)
-            request.session["resume_data"] = data
+    return render(request, "upload.html", {"form": ResumeUploadForm()})
 
-            return render(request, "result.html", {"data": data})
 
-    return render(request, "upload.html", {"form": ResumeUploadForm()})
+def _parse_resume_job(parse_id, path):
+    try:
+        data = extract_resume_data(path)
+        ResumeParse.objects.filter(pk=parse_id).update(
+            data=data, status=ResumeParse.STATUS_DONE
+        )
+    except Exception as e:
+        print("Parse error:", e)
+        ResumeParse.objects.filter(pk=parse_id).update(
+            status=ResumeParse.STATUS_FAILED
+        )
+    finally:
+        connection.close()
+
+
+def resume_result(request):
+    resume_id = request.session.get("resume_id")
+    parse = ResumeParse.objects.filter(pk=resume_id).first() if resume_id else None
+
+    if not parse:
+        messages.error(request, "Upload your resume first.")
+        return redirect("upload_resume")
+
+    if parse.status == ResumeParse.STATUS_PENDING:
+        # The daemon parse thread dies with the process, so a worker
+        # restart can strand a row at pending; give up after a timeout
+        # instead of refreshing the processing page forever.
+        if timezone.now() - parse.created_at > _PARSE_TIMEOUT:
+            ResumeParse.objects.filter(pk=parse.pk).update(
+                status=ResumeParse.STATUS_FAILED
+            )
+            parse.status = ResumeParse.STATUS_FAILED
+        else:
+            return render(request, "processing.html")
+
+    if parse.status == ResumeParse.STATUS_FAILED:
+        messages.error(request, "Could not read that resume. Try another file.")
+        return redirect("upload_resume")
+
+    return render(request, "result.html", {"data": parse.data})
+
+
+def _get_resume_data(request):
+    # Sessions only hold the ResumeParse id; the payload itself is one
+    # row fetch instead of a serialize/deserialize per request.
+    resume_id = request.session.get("resume_id")
+    if resume_id is None:
+        return None
+    parse = ResumeParse.objects.filter(pk=resume_id).first()
+    return parse.data if parse else None
 
 
 def start_interview(request):
-    data = request.session.get("resume_data")
+    data = _get_resume_data(request)
     if not data:
         messages.error(request, "Upload your resume first.")
         return redirect("upload_resume")
@@ -255,7 +464,7 @@ def submit_answer(request):
         if q_index >= len(questions):
             return redirect("interview_feedback")
 
-        data = request.session.get("resume_data")
+        data = _get_resume_data(request)
         return render(request, "interview.html", {
             "question": questions[q_index],
             "index": q_index + 1,
@@ -268,7 +477,7 @@ def submit_answer(request):
 
 def interview_feedback(request):
     answers = request.session.get('answers', [])
-    data = request.session.get('resume_data', {})
+    data = _get_resume_data(request) or {}
 
     if not answers:
         messages.error(request, "No answers found.")
@@ -277,7 +486,23 @@ def interview_feedback(request):
     # --------------------------
     # 1️⃣ Calculate Score (0–10)
     # --------------------------
-    total_words = sum(len(a.split()) for a in answers)
+    # One pass over the answers gathers every per-answer metric the
+    # sections below need, instead of re-splitting and re-lowercasing
+    # the same strings in each check.
+    joined_lower = " ".join(answers).lower()
+
+    total_words = 0
+    mentions_experience = mentions_project = False
+    has_short_answer = has_long_answer = False
+    for a in answers:
+        word_count = len(a.split())
+        total_words += word_count
+        a_lower = a.lower()
+        mentions_experience = mentions_experience or "experience" in a_lower
+        mentions_project = mentions_project or "project" in a_lower
+        has_short_answer = has_short_answer or word_count < 10
+        has_long_answer = has_long_answer or word_count > 40
+
     avg_len = total_words / len(answers)
 
     # Score based on answer depth
@@ -295,11 +520,11 @@ def interview_feedback(request):
     strengths = []
     if avg_len > 25:
         strengths.append("You provide detailed and structured explanations.")
-    if any("experience" in a.lower() for a in answers):
+    if mentions_experience:
         strengths.append("You present your past experiences confidently.")
-    if any(len(a.split()) > 40 for a in answers):
+    if has_long_answer:
         strengths.append("Your answers show strong clarity and elaboration.")
-    if any(skill.lower() in " ".join(answers).lower() for skill in data.get("skills", [])):
+    if any(skill.lower() in joined_lower for skill in data.get("skills", [])):
         strengths.append("Good use of your technical skills in explanations.")
 
     if not strengths:
@@ -311,11 +536,11 @@ def interview_feedback(request):
     improvements = []
     if avg_len < 20:
         improvements.append("Your answers are short. Try to add examples or explanations.")
-    if not any("project" in a.lower() for a in answers):
+    if not mentions_project:
         improvements.append("You didn't mention project details — include concrete achievements.")
-    if any(len(a.split()) < 10 for a in answers):
+    if has_short_answer:
         improvements.append("Some answers were too brief. Add clarity and structure.")
-    if "error" in " ".join(answers).lower():
+    if "error" in joined_lower:
         improvements.append("Revise debugging techniques; rely on systematic approaches.")
 
     # If still empty:
@@ -328,18 +553,10 @@ def interview_feedback(request):
     job_role = data.get("job_role", "").lower()
     resume_skills = set([s.lower() for s in data.get("skills", [])])
 
-    job_skill_map = {
-        "full stack developer": ["python", "django", "html", "css", "javascript", "react", "node"],
-        "software engineer": ["java", "python", "c++", "algorithms", "dsa"],
-        "data scientist": ["python", "machine learning", "pandas", "numpy", "sql", "deep learning"],
-        "cloud engineer": ["aws", "azure", "gcp", "linux", "terraform"],
-        "data analyst": ["sql", "excel", "power bi", "python", "tableau"]
-    }
-
     matched_role = None
     recommended_skills = []
 
-    for role, required in job_skill_map.items():
+    for role, required in _JOB_SKILL_MAP.items():
         if role.lower() in job_role:
             matched_role = role
             recommended_skills = [s for s in required if s not in resume_skills]
@@ -383,7 +600,7 @@ def login_candidate(request):
         email = request.POST.get("email")
         pwd = request.POST.get("password")
 
-        user = Candidate.objects.filter(email=email).first()
+        user = Candidate.objects.only("id", "password").filter(email=email).first()
 
         if user and check_password(pwd, user.password):
             request.session["candidate"] = email
@@ -402,11 +619,14 @@ def signup_candidate(request):
 
         if pwd != confirm:
             messages.error(request, "Passwords do not match")
-        elif Candidate.objects.filter(email=email).exists():
-            messages.error(request, "Email already registered")
         else:
-            Candidate.objects.create(email=email, password=make_password(pwd))
-            messages.success(request, "Account created!")
-            return redirect("login_candidate")
+            _, created = Candidate.objects.get_or_create(
+                email=email,
+                defaults={"password": make_password(pwd)},
+            )
+            if created:
+                messages.success(request, "Account created!")
+                return redirect("login_candidate")
+            messages.error(request, "Email already registered")
 
     return render(request, "signin.html")